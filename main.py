@@ -1,14 +1,23 @@
 import time
 import random
+import argparse
 import threading
 from simulator.node import SimulatedNode
 from simulator.mesh import MeshSimulation
+from simulator.telemetry import TelemetryWriter
 from simulator.interface import TCPServer, ClientHandler # ClientHandler is needed to manually inject packets for processing
 from meshtastic.protobuf import mesh_pb2, portnums_pb2
 
 def main():
+    parser = argparse.ArgumentParser(description="Meshtastic mesh simulator")
+    parser.add_argument("--telemetry-dir", help="Stream per-tick link and routing tables to columnar files in this directory")
+    args = parser.parse_args()
+
     # Setup Simulation
     sim = MeshSimulation()
+    if args.telemetry_dir:
+        sim.telemetry = TelemetryWriter(args.telemetry_dir)
+        print(f"Writing telemetry to {sim.telemetry.directory}")
     
     # Create Host Node (the one you connect to)
     host = SimulatedNode(node_id=0x12345678, short_name="HOST", long_name="Simulator Host", lat=40.7128, lon=-74.0060, persona="You are the host Meshtastic node.")
@@ -74,17 +83,19 @@ def main():
                 print("  (Enter)       - Continue simulation loop.")
                 print("  Ctrl+C        - Stop simulator.")
             elif cmd_line.lower() == 'n':
-                print("\n--- Current Simulated Nodes State ---")
-                for node in sim.nodes:
+                snapshot = sim.snapshot
+                print(f"\n--- Current Simulated Nodes State (tick {snapshot.tick}) ---")
+                for state in snapshot.nodes:
+                    node = state.node
                     print(f"Node: {node.long_name} ({node.short_name}) - ID: !{node.node_id:08x} - Lat: {node.lat:.4f}, Lon: {node.lon:.4f}")
-                    print(f"  Current SNR: {node.snr:.2f} dB (for its own NodeInfo)")
-                    print(f"  Hops Away from Host: {node.hops_away}")
-                    if node.observed_peers:
+                    print(f"  Current SNR: {state.snr:.2f} dB (for its own NodeInfo)")
+                    print(f"  Hops Away from Host: {state.hops_away}")
+                    if state.observed_peers:
                         print("  Observed Peers:")
-                        for peer_id, info in node.observed_peers.items():
-                            peer_node = next((p for p in sim.nodes if p.node_id == peer_id), None)
-                            peer_name = peer_node.short_name if peer_node else f"!{peer_id:08x}"
-                            print(f"    - {peer_name} (ID: !{peer_id:08x}) - SNR: {info['snr']:.2f} dB - Last Heard: {time.ctime(info['last_heard'])}")
+                        for peer_id, link in state.observed_peers.items():
+                            peer_state = snapshot.get_node(peer_id)
+                            peer_name = peer_state.node.short_name if peer_state else f"!{peer_id:08x}"
+                            print(f"    - {peer_name} (ID: !{peer_id:08x}) - SNR: {link.snr:.2f} dB - Last Heard: {time.ctime(link.last_heard)}")
                     else:
                         print("  No Peers Observed.")
                 print("-------------------------------------")
@@ -102,7 +113,8 @@ def main():
                         
                         dest_node_id = int(target_id_str, 16)
 
-                        target_node = next((n for n in sim.nodes if n.node_id == dest_node_id), None)
+                        target_state = sim.snapshot.get_node(dest_node_id)
+                        target_node = target_state.node if target_state else None
 
                         if target_node and target_node != sim.host_node:
                             message_text = parts[2]
@@ -114,8 +126,7 @@ def main():
                             mp = mesh_pb2.MeshPacket()
                             setattr(mp, 'from', sim.host_node.node_id) # Host is sending it
                             mp.to = dest_node_id
-                            # Packet ID is uint32. Use random or mask timestamp.
-                            mp.id = int(time.time()) & 0xFFFFFFFF 
+                            mp.id = sim.host_node.next_packet_id()
                             mp.hop_limit = 3
                             mp.decoded.portnum = portnums_pb2.TEXT_MESSAGE_APP
                             mp.decoded.payload = message_text.encode('utf-8')
@@ -144,6 +155,9 @@ def main():
     except KeyboardInterrupt:
         print("\nStopping...")
         server.stop()
+    finally:
+        if sim.telemetry:
+            sim.telemetry.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
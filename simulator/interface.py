@@ -96,6 +96,8 @@ class ClientHandler(threading.Thread):
             return
 
         print("Sending handshake...")
+        # Work from a single snapshot so the peer list stays consistent even if a tick lands mid-handshake
+        snapshot = self.simulation.snapshot
 
         # 1. Send MyInfo
         fr = mesh_pb2.FromRadio()
@@ -103,14 +105,14 @@ class ClientHandler(threading.Thread):
         self.send_packet(fr)
         time.sleep(0.1)
 
-        # 2. Send NodeInfo for self
+        # 2. Send NodeInfo for self (the host sees itself directly)
         fr = mesh_pb2.FromRadio()
-        fr.node_info.CopyFrom(host.get_node_info())
+        fr.node_info.CopyFrom(host.get_node_info(snr=0.0, hops_away=0))
         self.send_packet(fr)
         time.sleep(0.1)
         
         # 3. Send NodeInfo for peers
-        for peer in self.simulation.get_peers():
+        for peer in snapshot.get_peers():
             fr = mesh_pb2.FromRadio()
             fr.node_info.CopyFrom(peer.get_node_info())
             self.send_packet(fr)
@@ -143,7 +145,7 @@ class ClientHandler(threading.Thread):
                          # Handle the message if it's for one of our simulated nodes
                          # 'from' is a reserved keyword, so we use getattr
                          sender_id = getattr(mesh_packet, 'from')
-                         self.process_text_message(mesh_packet.to, sender_id, message_text)
+                         self.process_text_message(mesh_packet.to, sender_id, mesh_packet.id, message_text)
                      except Exception as e:
                          print(f"    Error decoding text payload: {e}")
 
@@ -156,17 +158,18 @@ class ClientHandler(threading.Thread):
             import traceback
             traceback.print_exc()
 
-    def process_text_message(self, dest_node_id, from_node_id, text):
+    def process_text_message(self, dest_node_id, from_node_id, packet_id, text):
         # Find the target node
-        target_node = None
-        for node in self.simulation.nodes:
-            if node.node_id == dest_node_id:
-                target_node = node
-                break
+        target_state = self.simulation.snapshot.get_node(dest_node_id)
+        target_node = target_state.node if target_state else None
         
         # Also handle broadcast (0xFFFFFFFF) - maybe pick a random node to reply?
         # For now, only handle direct messages to simulated nodes
         if target_node and target_node != self.simulation.host_node:
+            # Drop packets this node has already seen, as the firmware does
+            if packet_id and target_node.seen_packets.check_and_add(from_node_id, packet_id):
+                print(f"    Dropping duplicate packet {packet_id:08x} from !{from_node_id:08x}")
+                return
             # Run in a separate thread to not block the receive loop while Ollama thinks
             threading.Thread(target=self._generate_and_send_reply, args=(target_node, from_node_id, text), daemon=True).start()
 
@@ -179,7 +182,9 @@ class ClientHandler(threading.Thread):
             # 'from' is a reserved keyword
             setattr(mp, 'from', target_node.node_id)
             mp.to = original_sender_id
-            mp.id = int(time.time()) # Random packet ID
+            mp.id = target_node.next_packet_id()
+            # Remember our own packet so it isn't handled again if it comes back to us
+            target_node.seen_packets.check_and_add(target_node.node_id, mp.id)
             mp.hop_limit = 3
             
             # Set payload
@@ -1,8 +1,9 @@
 import time
 import random
 import math
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from .node import SimulatedNode
+from .topology import NodeState, PeerLink, TopologySnapshot
 
 class MeshSimulation:
     def __init__(self):
@@ -11,6 +12,10 @@ class MeshSimulation:
         self.snr_threshold = -10.0 # dB, below this, node is not 'seen'
         self.max_snr = 30.0 # dB, max possible SNR at close range
         self.snr_drop_per_log_distance = 20.0 # dB per decade (factor of 10 distance increase)
+        # Current topology. Only ever replaced as a whole (never mutated), so
+        # readers on other threads can grab it without locking.
+        self.snapshot: TopologySnapshot = TopologySnapshot.empty()
+        self.telemetry = None # Optional TelemetryWriter, receives every published snapshot
 
     def add_node(self, node: SimulatedNode):
         self.nodes.append(node)
@@ -20,99 +25,94 @@ class MeshSimulation:
         self.host_node = node
         if node not in self.nodes:
             self.nodes.append(node)
-    
+        # Routing is relative to the host, so re-route once there is a topology to route over
+        if self.snapshot.tick:
+            self.update_routing()
+
+    def _publish(self, links: Dict[int, Dict[int, PeerLink]]):
+        """Computes routing for the given links and atomically swaps in a new snapshot."""
+        nodes = list(self.nodes)
+        routes = self._compute_routing(nodes, links)
+        self.snapshot = TopologySnapshot.build(self.snapshot.tick + 1, self.host_node, nodes, links, routes)
+        if self.telemetry:
+            self.telemetry.record(self.snapshot)
+
     def update_routing(self):
         """
+        Recomputes routing over the current snapshot's links (e.g. after the host changed) and publishes it.
+        Nodes added since the last radio tick have no links yet and stay unreachable until the next one.
+        """
+        links = {state.node_id: dict(state.observed_peers) for state in self.snapshot.nodes}
+        self._publish(links)
+
+    def _compute_routing(self, nodes: List[SimulatedNode],
+                         links: Dict[int, Dict[int, PeerLink]]) -> Dict[int, Tuple[int, float]]:
+        """
         Calculates routing tables (hops and next-hop SNR) from the Host Node to all other nodes.
-        Uses BFS to find shortest path.
+        Uses BFS to find shortest path. Returns {node_id: (hops_away, snr)}; nodes missing
+        from the result are unreachable.
         """
         if not self.host_node:
-            return
-
-        # 1. Reset all nodes to unreachable
-        for node in self.nodes:
-            if node != self.host_node:
-                node.hops_away = -1 # Unreachable
-                node.snr = 0.0
-
-        # 2. BFS
-        # We initialize with the host node.
-        self.host_node.hops_away = 0
-        self.host_node.snr = 0.0 # Host sees itself perfectly/irrelevant
-        
-        queue = [self.host_node] 
-        visited = {self.host_node.node_id}
-        
+            return {}
+
+        known_ids = {node.node_id for node in nodes}
+        host_id = self.host_node.node_id
+
+        # Host sees itself perfectly/irrelevant
+        routes = {host_id: (0, 0.0)}
+
         # We need to track what the Host "sees" for each node.
         # If direct (hops=0), SNR is the direct link.
         # If indirect (hops>0), SNR is the link of the *first hop* from Host.
-        
+
         # Direct neighbors of host
-        for peer_id, metrics in self.host_node.observed_peers.items():
-             peer = self._find_node_by_id(peer_id)
-             if peer:
-                 peer.hops_away = 0
-                 peer.snr = metrics['snr']
-                 visited.add(peer_id)
-                 queue.append(peer)
+        queue = []
+        for peer_id, link in links.get(host_id, {}).items():
+            if peer_id in known_ids:
+                routes[peer_id] = (0, link.snr)
+                queue.append(peer_id)
 
         # Now traverse deeper (starting from the direct neighbors we just added)
-        # We skip the host node (index 0) because we already processed its neighbors manually above
-        current_index = 1 
-        
+        current_index = 0
+
         while current_index < len(queue):
-            current_node = queue[current_index]
+            current_id = queue[current_index]
             current_index += 1
-            
-            current_hops = current_node.hops_away
-            
+
+            current_hops, current_snr = routes[current_id]
+
             # Check neighbors of this node
-            for peer_id in current_node.observed_peers.keys():
-                if peer_id not in visited:
-                    peer = self._find_node_by_id(peer_id)
-                    if peer:
-                        peer.hops_away = current_hops + 1
-                        # For indirect nodes, the SNR reported to the host is typically
-                        # the SNR of the packet arriving at the host.
-                        # Which means it's the SNR of the 'root' neighbor in this branch.
-                        # But for simplicity here, we might just leave the SNR as 
-                        # whatever the last 'hop' link was, or copy the parent's effective SNR.
-                        # Let's copy the parent's SNR as that's the link quality 'towards' this node from Host perspective.
-                        peer.snr = current_node.snr 
-                        
-                        visited.add(peer_id)
-                        queue.append(peer)
-
-    def _find_node_by_id(self, node_id) -> Optional[SimulatedNode]:
-        for node in self.nodes:
-            if node.node_id == node_id:
-                return node
-        return None
-
-    def get_peers(self) -> List[SimulatedNode]:
-        """Returns all nodes that are reachable by the host node (hops >= 0)."""
-        if not self.host_node:
-            return []
-        
-        reachable_nodes = []
-        for node in self.nodes:
-            if node != self.host_node and node.hops_away >= 0:
-                reachable_nodes.append(node)
-        return reachable_nodes
+            for peer_id in links.get(current_id, {}):
+                if peer_id not in routes and peer_id in known_ids:
+                    # For indirect nodes, copy the parent's SNR as that's the link
+                    # quality 'towards' this node from Host perspective.
+                    routes[peer_id] = (current_hops + 1, current_snr)
+                    queue.append(peer_id)
+
+        return routes
+
+    def get_peers(self) -> List[NodeState]:
+        """Returns the states of all nodes reachable by the host node (hops >= 0) in the current snapshot."""
+        return self.snapshot.get_peers()
 
     def simulate_radio_environment(self):
         """
-        Simulates the radio environment, updating each node's observed peers and SNRs.
+        Simulates the radio environment, working out which peers each node hears and at what SNR.
         This runs for each node as a potential receiver to determine what it 'hears'.
+        The result is published as a new TopologySnapshot; nodes are not modified.
         """
-        for source_node in self.nodes:
-            source_node.observed_peers = {} # Reset observed peers for this source node
-            for target_node in self.nodes:
+        nodes = list(self.nodes)
+        now = int(time.time())
+        links: Dict[int, Dict[int, PeerLink]] = {}
+
+        for source_node in nodes:
+            observed_peers = {}
+            for target_node in nodes:
                 if source_node.node_id == target_node.node_id:
                     continue # A node doesn't 'observe' itself as a peer
 
                 distance = source_node.calculate_distance(target_node) # in km
-                
+
                 # Simplified propagation model
                 # FSPL = 20*log10(d) + 20*log10(f) + 20*log10(4*pi/c)
                 # Let's simplify to SNR = K - 20*log10(distance) + noise
@@ -124,12 +124,10 @@ class MeshSimulation:
                     snr_loss = self.snr_drop_per_log_distance * math.log10(distance)
                     calculated_snr = self.max_snr - snr_loss + random.uniform(-2.0, 2.0) # Add some random noise
 
-                # Apply threshold and update observed peers
+                # Apply threshold and record observed peer
                 if calculated_snr >= self.snr_threshold:
-                    source_node.observed_peers[target_node.node_id] = {
-                        "last_heard": int(time.time()),
-                        "snr": calculated_snr
-                    }
-        
-        # After simulating physical links, calculate the mesh routing
-        self.update_routing()
+                    observed_peers[target_node.node_id] = PeerLink(last_heard=now, snr=calculated_snr)
+            links[source_node.node_id] = observed_peers
+
+        # After simulating physical links, calculate the mesh routing and publish
+        self._publish(links)
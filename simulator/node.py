@@ -8,6 +8,7 @@ except ImportError:
     OLLAMA_AVAILABLE = False
 
 from meshtastic.protobuf import mesh_pb2, config_pb2
+from .packets import PacketIdGenerator, SeenPacketCache
 
 class SimulatedNode:
     def __init__(self, node_id: int, short_name: str, long_name: str, lat: float, lon: float, persona: str = "You are a helpful mesh node."):
@@ -18,9 +19,14 @@ class SimulatedNode:
         self.lon = lon
         self.persona = persona
         self.last_seen = time.time() # This node's last activity
-        self.snr = 10.0  # Default simulated SNR
-        self.observed_peers = {} # {node_id: {"last_heard": timestamp, "snr": snr}}
-        self.hops_away = 0 # Distance from host (0 if direct, >0 if multi-hop)
+        # Links and routing (observed peers, SNR, hops away) live in the
+        # simulation's TopologySnapshot, not on the node itself.
+        self.packet_ids = PacketIdGenerator()
+        self.seen_packets = SeenPacketCache() # Recently seen (from, id) pairs, for duplicate suppression
+
+    def next_packet_id(self) -> int:
+        """Returns a fresh packet id for a packet originating from this node."""
+        return self.packet_ids.next_id()
 
     def calculate_distance(self, other_node: 'SimulatedNode') -> float:
         """Calculate distance between two nodes using Haversine formula (km)."""
@@ -40,8 +46,8 @@ class SimulatedNode:
         distance = R * c
         return distance
 
-    def get_node_info(self) -> mesh_pb2.NodeInfo:
-        """Constructs and returns the NodeInfo protobuf for this node."""
+    def get_node_info(self, snr: float, hops_away: int) -> mesh_pb2.NodeInfo:
+        """Constructs and returns the NodeInfo protobuf for this node, as seen from the host."""
         n = mesh_pb2.NodeInfo()
         n.num = self.node_id
         
@@ -59,9 +65,9 @@ class SimulatedNode:
         n.position.time = int(time.time())
         
         # Metrics
-        n.snr = self.snr 
+        n.snr = snr
         n.last_heard = int(self.last_seen)
-        n.hops_away = self.hops_away
+        n.hops_away = hops_away
         
         return n
 
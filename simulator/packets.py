@@ -0,0 +1,89 @@
+import time
+import random
+import threading
+from array import array
+from typing import Optional
+
+MAX_PACKET_ID = 0xFFFFFFFF
+
+class PacketIdGenerator:
+    """
+    Generates 32-bit packet ids the way the firmware does: a rolling counter
+    seeded from a random starting point, so ids stay unique within a node
+    even when many packets are sent in the same second.
+    """
+    def __init__(self, seed: Optional[int] = None):
+        self._next_id = seed if seed is not None else random.randint(1, MAX_PACKET_ID)
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        with self._lock:
+            packet_id = self._next_id
+            # Wrap around the uint32 range, skipping 0 (reserved for 'no id')
+            self._next_id = (self._next_id % MAX_PACKET_ID) + 1
+            return packet_id
+
+class SeenPacketCache:
+    """
+    Fixed-size record of recently seen (from, id) pairs, used to drop duplicate
+    packets before they are handled or rebroadcast.
+
+    Entries live in preallocated ring arrays; a dict maps each key to its slot
+    for O(1) lookup. Once the ring is full the oldest slot is overwritten, so
+    memory per node stays constant no matter how many packets pass through.
+    """
+    def __init__(self, capacity: int = 256, max_age_secs: float = 600.0):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.max_age_secs = max_age_secs
+        self._keys = array('Q', bytes(8 * capacity))
+        self._times = array('d', bytes(8 * capacity))
+        self._slots = {} # {key: ring slot index}
+        self._head = 0 # Next slot to overwrite
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _make_key(from_id: int, packet_id: int) -> int:
+        return ((from_id & MAX_PACKET_ID) << 32) | (packet_id & MAX_PACKET_ID)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def seen(self, from_id: int, packet_id: int, now: Optional[float] = None) -> bool:
+        """Returns True if the packet was seen within max_age_secs, without recording it."""
+        if now is None:
+            now = time.time()
+        with self._lock:
+            slot = self._slots.get(self._make_key(from_id, packet_id))
+            return slot is not None and now - self._times[slot] <= self.max_age_secs
+
+    def check_and_add(self, from_id: int, packet_id: int, now: Optional[float] = None) -> bool:
+        """
+        Records the packet and returns True if it is a duplicate (already seen
+        and not yet expired), False if it is new.
+        """
+        if now is None:
+            now = time.time()
+        key = self._make_key(from_id, packet_id)
+
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is not None:
+                if now - self._times[slot] <= self.max_age_secs:
+                    return True
+                # Expired entry: forget its old slot and reinsert it at the head
+                # below, so the ring stays in arrival order
+                del self._slots[key]
+
+            # Evict whatever currently occupies the head slot
+            slot = self._head
+            old_key = self._keys[slot]
+            if self._slots.get(old_key) == slot:
+                del self._slots[old_key]
+
+            self._keys[slot] = key
+            self._times[slot] = now
+            self._slots[key] = slot
+            self._head = (slot + 1) % self.capacity
+            return False
@@ -0,0 +1,178 @@
+import os
+import sys
+import json
+import time
+import queue
+import threading
+from array import array
+from typing import Dict, List, Optional
+from .topology import TopologySnapshot
+
+# Column layouts (name, array typecode) for the two tables written each tick.
+# links:  every radio link heard during the tick (src hears dst at snr).
+# routes: the host's routing result for every node (hops -1 = unreachable).
+LINK_COLUMNS = [("tick", "I"), ("src", "I"), ("dst", "I"), ("snr", "f")]
+ROUTE_COLUMNS = [("tick", "I"), ("src", "I"), ("dst", "I"), ("snr", "f"), ("hops", "i")]
+
+FORMAT_VERSION = 1
+
+class _ColumnBuffer:
+    """Accumulates rows of one table column-wise and flushes them as numbered chunk files."""
+    def __init__(self, directory: str, table: str, columns, chunk_rows: int):
+        self.directory = directory
+        self.table = table
+        self.columns = columns
+        self.chunk_rows = chunk_rows
+        self.chunk_index = 0
+        self._reset()
+
+    def _reset(self):
+        self.data = {name: array(typecode) for name, typecode in self.columns}
+        self.rows = 0
+
+    def append(self, *values):
+        for (name, _), value in zip(self.columns, values):
+            self.data[name].append(value)
+        self.rows += 1
+        if self.rows >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        path = os.path.join(self.directory, f"{self.table}-{self.chunk_index:05d}.col")
+        header = {
+            "version": FORMAT_VERSION,
+            "table": self.table,
+            "rows": self.rows,
+            "byteorder": sys.byteorder,
+            "columns": [[name, typecode, self.data[name].itemsize] for name, typecode in self.columns],
+        }
+        # Write to a temp file first so readers never pick up a half-written chunk
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            for name, _ in self.columns:
+                self.data[name].tofile(f)
+        os.replace(tmp_path, path)
+        self.chunk_index += 1
+        self._reset()
+
+def read_chunk(path: str) -> Dict[str, array]:
+    """Loads one chunk file written by TelemetryWriter into {column_name: array}."""
+    with open(path, "rb") as f:
+        header = json.loads(f.readline())
+        rows = header["rows"]
+        result = {}
+        for name, typecode, itemsize in header["columns"]:
+            column = array(typecode)
+            if column.itemsize != itemsize:
+                raise ValueError(f"Column '{name}' was written with {itemsize}-byte items, this platform uses {column.itemsize}")
+            column.fromfile(f, rows)
+            if header["byteorder"] != sys.byteorder:
+                column.byteswap()
+            result[name] = column
+    return result
+
+def _make_run_directory(directory: str) -> str:
+    """Creates a fresh run-<start time> subdirectory so runs never overwrite each other."""
+    base = os.path.join(directory, time.strftime("run-%Y%m%d-%H%M%S"))
+    path = base
+    suffix = 1
+    while True:
+        try:
+            os.makedirs(path)
+            return path
+        except FileExistsError:
+            # Another run started in the same second
+            path = f"{base}-{suffix}"
+            suffix += 1
+
+class TelemetryWriter:
+    """
+    Streams each tick's link table and routing results to chunked columnar files.
+
+    record() only hands the (immutable) snapshot to a background thread, so the
+    tick loop never waits on disk. The queue is bounded; if the writer falls
+    behind, new snapshots are dropped and counted rather than piling up in RAM.
+    Each table is written out whenever it reaches chunk_rows rows, and at least
+    every flush_interval_secs, so a crash loses at most that much data.
+    Every writer gets its own run subdirectory of `directory`.
+    """
+    def __init__(self, directory: str, chunk_rows: int = 1_000_000, max_pending_ticks: int = 4,
+                 flush_interval_secs: float = 30.0):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = _make_run_directory(directory)
+        self.flush_interval_secs = flush_interval_secs
+        self.dropped_ticks = 0
+        self._queue: "queue.Queue[Optional[TopologySnapshot]]" = queue.Queue(maxsize=max_pending_ticks)
+        self._links = _ColumnBuffer(self.directory, "links", LINK_COLUMNS, chunk_rows)
+        self._routes = _ColumnBuffer(self.directory, "routes", ROUTE_COLUMNS, chunk_rows)
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._closed = False
+        self._thread.start()
+
+    def record(self, snapshot: TopologySnapshot):
+        """Queues a snapshot for writing. Never blocks."""
+        if self._closed:
+            return
+        try:
+            self._queue.put_nowait(snapshot)
+        except queue.Full:
+            self.dropped_ticks += 1
+
+    def close(self):
+        """Writes out everything still queued or buffered and stops the background thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        if self.dropped_ticks:
+            print(f"Telemetry: dropped {self.dropped_ticks} ticks (writer fell behind)")
+
+    def _write_loop(self):
+        last_flush = time.monotonic()
+        while True:
+            try:
+                snapshot = self._queue.get(timeout=self.flush_interval_secs)
+            except queue.Empty:
+                snapshot = False # Nothing arrived; just check whether a flush is due
+            if snapshot is None:
+                break
+            if snapshot:
+                try:
+                    self._write_snapshot(snapshot)
+                except Exception as e:
+                    print(f"Telemetry write error: {e}")
+            if time.monotonic() - last_flush >= self.flush_interval_secs:
+                self._flush()
+                last_flush = time.monotonic()
+        self._flush()
+
+    def _flush(self):
+        """Writes out any partially filled chunks."""
+        for buffer in (self._links, self._routes):
+            try:
+                buffer.flush()
+            except Exception as e:
+                print(f"Telemetry write error: {e}")
+
+    def _write_snapshot(self, snapshot: TopologySnapshot):
+        tick = snapshot.tick
+        host_id = snapshot.host_id if snapshot.host_id is not None else 0
+        for state in snapshot.nodes:
+            for peer_id, link in state.observed_peers.items():
+                self._links.append(tick, state.node_id, peer_id, link.snr)
+            self._routes.append(tick, host_id, state.node_id, state.snr, state.hops_away)
+
+def list_runs(directory: str) -> List[str]:
+    """Returns the run subdirectories written under a telemetry directory, oldest first."""
+    names = sorted(n for n in os.listdir(directory) if n.startswith("run-"))
+    return [os.path.join(directory, n) for n in names]
+
+def list_chunks(directory: str, table: str) -> List[str]:
+    """Returns the chunk files for a table ('links' or 'routes') of one run directory, in write order."""
+    prefix = f"{table}-"
+    names = sorted(n for n in os.listdir(directory) if n.startswith(prefix) and n.endswith(".col"))
+    return [os.path.join(directory, n) for n in names]
@@ -0,0 +1,69 @@
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+from meshtastic.protobuf import mesh_pb2
+from .node import SimulatedNode
+
+class PeerLink(NamedTuple):
+    """A radio link as heard by one node."""
+    last_heard: int
+    snr: float
+
+class NodeState(NamedTuple):
+    """The routing state of a single node at the time a snapshot was taken."""
+    node: SimulatedNode
+    hops_away: int # -1 if unreachable from the host
+    snr: float # SNR as reported by the host for this node
+    observed_peers: Mapping[int, PeerLink] # {node_id: PeerLink}, read-only
+
+    @property
+    def node_id(self) -> int:
+        return self.node.node_id
+
+    def get_node_info(self) -> mesh_pb2.NodeInfo:
+        return self.node.get_node_info(snr=self.snr, hops_away=self.hops_away)
+
+class TopologySnapshot:
+    """
+    Immutable view of the mesh (nodes, links and routing) as of one tick.
+
+    The simulation builds a fresh snapshot each tick and publishes it by
+    swapping a single reference, so readers holding a snapshot always see a
+    consistent picture without taking any locks.
+    """
+    def __init__(self, tick: int, host_id: Optional[int], states: List[NodeState]):
+        self.tick = tick
+        self.host_id = host_id
+        self.nodes: Tuple[NodeState, ...] = tuple(states)
+        self._by_id = MappingProxyType({state.node_id: state for state in self.nodes})
+
+    @classmethod
+    def empty(cls) -> 'TopologySnapshot':
+        return cls(tick=0, host_id=None, states=[])
+
+    @classmethod
+    def build(cls, tick: int, host_node: Optional[SimulatedNode], nodes: List[SimulatedNode],
+              links: Dict[int, Dict[int, PeerLink]], routes: Dict[int, Tuple[int, float]]) -> 'TopologySnapshot':
+        """Freezes freshly computed links and routes into a new snapshot."""
+        states = []
+        for node in nodes:
+            hops_away, snr = routes.get(node.node_id, (-1, 0.0))
+            peers = MappingProxyType(dict(links.get(node.node_id, {})))
+            states.append(NodeState(node, hops_away, snr, peers))
+        return cls(tick, host_node.node_id if host_node else None, states)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def get_node(self, node_id: int) -> Optional[NodeState]:
+        return self._by_id.get(node_id)
+
+    def get_host(self) -> Optional[NodeState]:
+        if self.host_id is None:
+            return None
+        return self._by_id.get(self.host_id)
+
+    def get_peers(self) -> List[NodeState]:
+        """Returns all nodes that are reachable by the host node (hops >= 0)."""
+        if self.host_id is None:
+            return []
+        return [state for state in self.nodes if state.node_id != self.host_id and state.hops_away >= 0]